@@ -1,17 +1,14 @@
-import sys
-import os
 import asyncio
 import numpy as np
 import torch
 
-# Add src to path
-sys.path.append(os.path.join(os.getcwd(), "src"))
+from mcp_kokoro import get_pipeline_async, start_background_loading
 
-from mcp_kokoro import get_pipeline
+# Load the model weights while the rest of the script starts up
+start_background_loading()
 
-def test_audio_levels():
+def test_audio_levels(pipe):
     print("Testing audio levels...")
-    pipe = get_pipeline()
     if not pipe:
         print("Failed to get pipeline")
         return
@@ -92,11 +89,8 @@ def test_audio_levels():
         print("Levels look safe.")
 
 if __name__ == "__main__":
-    import time
-    for _ in range(20):
-        if get_pipeline():
-            break
-        print("Waiting for pipeline...")
-        time.sleep(1)
-        
-    test_audio_levels()
+    print("Waiting for pipeline...")
+    # Returns as soon as the pipeline is ready instead of polling
+    pipe = asyncio.run(get_pipeline_async(timeout=20))
+
+    test_audio_levels(pipe)
@@ -1,10 +1,54 @@
 import asyncio
+import atexit
+import copy
+import dataclasses
 import os
+import re
 import sys
 import threading
+import time
+
+# Some of Kokoro's ops have no MPS kernels yet; let them fall back to the CPU instead
+# of failing, so Apple Silicon can use the GPU for everything else. This has to be
+# set before torch is imported.
+os.environ.setdefault('PYTORCH_ENABLE_MPS_FALLBACK', '1')
+
 import torch
 from mcp.server.fastmcp import FastMCP
 
+# Import sounddevice up front so the first speak() call doesn't pay for it.
+# Keep the module importable on headless machines without PortAudio.
+try:
+    import sounddevice as sd
+except (ImportError, OSError):
+    sd = None
+
+def _detect_device() -> str:
+    """Pick the torch device, preferring CUDA, then MPS, then CPU."""
+    if torch.cuda.is_available():
+        return 'cuda'
+    if torch.backends.mps.is_available():
+        return 'mps'
+    return 'cpu'
+
+# Probe the backends once at import; MCP_KOKORO_DEVICE overrides the choice
+DEVICE = os.environ.get('MCP_KOKORO_DEVICE') or _detect_device()
+
+# MCP_KOKORO_QUANT=int8 runs a quantized ONNX export of the model through ONNX
+# Runtime on the CPU instead of the torch model (requires the 'onnx' extra)
+QUANT = os.environ.get('MCP_KOKORO_QUANT')
+
+# CPU threads used by inference (torch intra-op and ONNX Runtime); unset keeps
+# each runtime's own default
+NUM_THREADS = int(os.environ.get('MCP_KOKORO_NUM_THREADS', 0)) or None
+if NUM_THREADS:
+    torch.set_num_threads(NUM_THREADS)
+
+# Nothing here needs gradients. Grad mode is per thread, so this only covers the
+# importing thread (e.g. scripts calling the pipeline directly); generation
+# threads enter inference_mode themselves.
+torch.set_grad_enabled(False)
+
 # Initialize FastMCP server
 mcp = FastMCP("Kokoro TTS")
 
@@ -12,9 +56,68 @@ mcp = FastMCP("Kokoro TTS")
 pipeline = None
 pipeline_lock = threading.Lock()
 pipeline_loading_thread = None
+# Set once initialization has finished, whether or not it succeeded
+pipeline_ready = threading.Event()
 
 import contextlib
 
+def _compile_model(model) -> bool:
+    """Compile the model's tensor-level forward pass with torch.compile to fuse kernels.
+
+    KModel.forward takes (and logs) the phoneme string, which dynamo would guard on
+    or break at, so only forward_with_tokens is compiled; it sees just the token
+    and style tensors and the speed.
+    """
+    forward = getattr(model, 'forward_with_tokens', None)
+    if not isinstance(model, torch.nn.Module) or forward is None:
+        return False
+    try:
+        # dynamic=True traces the token length symbolically, so new sentence
+        # lengths reuse the compiled code. No CUDA graphs ('reduce-overhead'):
+        # those are recorded per distinct input length, i.e. per sentence.
+        model.forward_with_tokens = torch.compile(forward, dynamic=True)
+        return True
+    except Exception as e:
+        print(f"torch.compile unavailable, using eager mode: {e}", file=sys.stderr)
+        return False
+
+def _warmup_pipeline(pipeline) -> bool:
+    """Run a short utterance through the pipeline, discarding the audio.
+
+    The first generation pays for CUDA kernel JIT, cuDNN autotuning, lazy module
+    loads and (when enabled) torch.compile graph capture; doing it at startup keeps
+    that cost off the first speak() request.
+    """
+    try:
+        # Load the default voice from (or into) the local voice cache, instead of
+        # letting the pipeline resolve it through the hub
+        _preload_voice(pipeline, 'af_heart')
+        with torch.inference_mode(), _autocast_context():
+            for _ in pipeline("Hello.", voice='af_heart', speed=1.0, split_pattern=r'\n+'):
+                pass
+        return True
+    except Exception as e:
+        print(f"Pipeline warm-up failed: {e}", file=sys.stderr)
+        return False
+
+def _autocast_context():
+    """Return the mixed-precision context used around generation.
+
+    On CUDA devices with bfloat16 support, matmul-heavy layers run in bf16 under
+    autocast (bf16 avoids the overflow issues fp16 has in vocoders). Voice packs and
+    ops autocast keeps in fp32 are unaffected. Set MCP_KOKORO_AUTOCAST=0 to disable.
+    On MPS, float16 autocast is opt-in with MCP_KOKORO_AUTOCAST=1; CPU always stays
+    in full precision.
+    """
+    autocast = os.environ.get('MCP_KOKORO_AUTOCAST')
+    if autocast == '0' or QUANT:
+        return contextlib.nullcontext()
+    if DEVICE == 'cuda' and torch.cuda.is_bf16_supported():
+        return torch.autocast('cuda', dtype=torch.bfloat16)
+    if DEVICE == 'mps' and autocast == '1':
+        return torch.autocast('mps', dtype=torch.float16)
+    return contextlib.nullcontext()
+
 def initialize_pipeline():
     global pipeline
     # Initialize pipeline synchronously before server start
@@ -27,163 +130,959 @@ def initialize_pipeline():
         with contextlib.redirect_stdout(sys.stderr):
             from kokoro import KPipeline
             
-            device = 'cuda' if torch.cuda.is_available() else ('mps' if torch.backends.mps.is_available() else 'cpu')
-            print(f"Using device: {device}", file=sys.stderr)
-            
-            # We explicitly pass repo_id to suppress the warning "Defaulting repo_id to..."
-            pipeline = KPipeline(lang_code='a', repo_id='hexgrad/Kokoro-82M', device=device)
-            
+            if QUANT:
+                from .onnx_model import ONNX_MODEL_FILES, OnnxKokoroModel
+
+                # Fail before loading anything rather than with a half-built pipeline
+                if QUANT not in ONNX_MODEL_FILES:
+                    raise ValueError(f"Unsupported MCP_KOKORO_QUANT '{QUANT}', expected one of: {', '.join(ONNX_MODEL_FILES)}")
+
+                print(f"Using ONNX Runtime ({QUANT}) on cpu", file=sys.stderr)
+
+                # KPipeline only handles G2P and voices; inference runs the quantized export
+                new_pipeline = KPipeline(lang_code='a', repo_id='hexgrad/Kokoro-82M', model=False)
+                new_pipeline.model = OnnxKokoroModel(QUANT, repo_id='hexgrad/Kokoro-82M', num_threads=NUM_THREADS)
+            else:
+                print(f"Using device: {DEVICE}", file=sys.stderr)
+
+                # We explicitly pass repo_id to suppress the warning "Defaulting repo_id to..."
+                new_pipeline = KPipeline(lang_code='a', repo_id='hexgrad/Kokoro-82M', device=DEVICE)
+
+            # Skip phonemization (espeak fallback included) for text seen before
+            new_pipeline.g2p = _CachedG2P(new_pipeline.g2p, new_pipeline.lang_code)
+
+            # torch.compile support on MPS is limited, so only compile for CUDA
+            compiled = DEVICE == 'cuda' and _compile_model(new_pipeline.model)
+
+            # Compilation is lazy, so a failing compiled model only shows up here
+            if not _warmup_pipeline(new_pipeline) and compiled:
+                print("Compiled model failed during warm-up, using eager mode.", file=sys.stderr)
+                # Drop the instance attribute so the class's eager method is used again
+                del new_pipeline.model.forward_with_tokens
+                _warmup_pipeline(new_pipeline)
+
+            # Only publish a fully set up pipeline; on any failure above it stays None
+            pipeline = new_pipeline
+
         print("Kokoro pipeline initialized successfully.", file=sys.stderr)
     except Exception as e:
         print(f"Error initializing Kokoro pipeline: {e}", file=sys.stderr)
         # We don't exit here, allowing the server to start, but 'speak' will fail later if pipeline is None
+    finally:
+        pipeline_ready.set()
+
+    if _pcm16_kernel is not None:
+        # Compile (or load the cached) PCM kernel ahead of the first request
+        try:
+            _to_pcm16(np.zeros(1, dtype=np.float32))
+        except Exception as e:
+            print(f"Failed to compile PCM conversion kernel: {e}", file=sys.stderr)
+
+    if sd is not None:
+        # Prime PortAudio's device enumeration ahead of the first request
+        try:
+            sd.query_devices(kind='output')
+        except Exception as e:
+            print(f"No audio output device found: {e}", file=sys.stderr)
+
+def start_background_loading():
+    """Start initializing the pipeline in a daemon thread, if it isn't loaded or loading.
+
+    Lets scripts load the model weights while they do other work. The server itself
+    initializes synchronously in main() before accepting connections.
+    """
+    global pipeline_loading_thread
+    with pipeline_lock:
+        if pipeline_loading_thread is None and not pipeline_ready.is_set():
+            pipeline_loading_thread = threading.Thread(
+                target=initialize_pipeline, name="kokoro-pipeline-loader", daemon=True
+            )
+            pipeline_loading_thread.start()
+
+def get_pipeline():
+    """Return the pipeline, loading it (or waiting for it to load) first.
+
+    Returns None if initialization failed.
+    """
+    start_background_loading()
+    pipeline_ready.wait()
+    return pipeline
+
+async def get_pipeline_async(timeout: float | None = None):
+    """Wait for pipeline initialization to finish and return the pipeline.
+
+    Starts loading if nothing has yet, and returns as soon as initialization
+    completes, or None if it failed or didn't finish within timeout seconds.
+    """
+    # The server initializes before accepting requests, so this is the usual case
+    # and needs no worker thread
+    if pipeline_ready.is_set():
+        return pipeline
+    start_background_loading()
+    if not await asyncio.to_thread(pipeline_ready.wait, timeout):
+        return None
+    return pipeline
 
 
-import queue
 import numpy as np
 import hashlib
+import importlib.metadata
+import queue
+import io
+import itertools
+import shelve
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
+
+try:
+    import numpy_minmax
+except ImportError:
+    numpy_minmax = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
 
 # Cache directory configuration
 CACHE_DIR = Path.home() / ".cache" / "mcp_kokoro"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+# Extracted voice packs (style embeddings), keyed by voice name. Only plain
+# voice names (or comma-separated blends of them) are cached, not file paths.
+VOICE_CACHE_DIR = CACHE_DIR / "voices"
+_VOICE_NAME_RE = re.compile(r'^[A-Za-z0-9_,]+$')
+
+# Phonemization results, keyed by language and text. Recently used entries are also
+# kept in memory, so repeated sentences skip G2P entirely. The database starts
+# over once it grows past its budget.
+G2P_CACHE_MAX_BYTES = 64 * 1024**2
+G2P_MEMORY_CACHE_SIZE = 1024
+
+# Number of cache files kept memory-mapped between requests, so repeated sentences
+# skip the header parse as well. Each map holds a file descriptor, so this stays
+# far below typical open file limits (256 on macOS).
+SEGMENT_MEMORY_CACHE_SIZE = 32
+
+# Kokoro outputs mono audio at 24 kHz
+SAMPLE_RATE = 24000
+
+# Audio is played and cached as 16-bit PCM, which halves disk usage and the bytes
+# handed to PortAudio compared to float32 at an inaudible quantization cost for speech
+PCM16_SCALE = 32767.0
+
+# Split on newlines OR sentence endings
+SPLIT_PATTERN = r'\n+|(?<=[.!?])\s+'
+_SPLIT_RE = re.compile(SPLIT_PATTERN)
+
+# A long, uncached first sentence is generated in two parts, split at its first
+# clause boundary, so the first audio only waits on a short segment
+FIRST_SEGMENT_MAX_CHARS = 80
+FIRST_CLAUSE_MIN_CHARS = 20
+_CLAUSE_RE = re.compile(r'(?<=[,;:])\s+')
+
+# Disk cache budget; least recently used entries are evicted beyond this size
+CACHE_MAX_BYTES = int(os.environ.get('MCP_KOKORO_CACHE_MAX_BYTES', 2 * 1024**3))
+# Minimum number of seconds between eviction scans of the cache directory
+CACHE_EVICTION_INTERVAL = 300
+
+# Testing switches: MCP_KOKORO_NULL_SINK=1 generates audio without playing it,
+# MCP_KOKORO_DRY_RUN=1 skips generation (and playback) entirely
+NULL_SINK = os.environ.get('MCP_KOKORO_NULL_SINK') == '1'
+DRY_RUN = os.environ.get('MCP_KOKORO_DRY_RUN') == '1'
+
 def _get_cache_path(text: str, voice: str, speed: float) -> Path:
     """Generate a unique file path for the given inputs."""
-    content_id = f"{text}|{voice}|{speed}"
-    file_hash = hashlib.sha256(content_id.encode('utf-8')).hexdigest()
+    content_id = f"{text}|{voice}|{speed}".encode('utf-8')
+    # 16-byte digests are plenty for a local cache and keep file names short. The
+    # hash must not depend on optional packages, or installing one would orphan
+    # every cached file.
+    file_hash = hashlib.blake2b(content_id, digest_size=16).hexdigest()
     return CACHE_DIR / f"{file_hash}.npy"
 
-def _speak_sync(text: str, voice: str, speed: float, pipeline):
-    """Synchronous function to handle audio generation and playback with persistent file caching."""
+def _evict_cache_if_needed(max_bytes: int = CACHE_MAX_BYTES):
+    """Delete least recently used cache files until the cache fits in max_bytes.
+
+    Scans are throttled through a timestamp file so the directory isn't listed on
+    every save.
+    """
+    stamp_path = CACHE_DIR / ".last_eviction"
     try:
-        # Lazy imports
-        import sounddevice as sd
-        
-        cache_path = _get_cache_path(text, voice, speed)
-        
-        # 1. Check Disk Cache
-        if cache_path.exists():
-            print(f"Disk cache hit for: '{text[:20]}...'", file=sys.stderr)
+        if time.time() - stamp_path.stat().st_mtime < CACHE_EVICTION_INTERVAL:
+            return
+    except FileNotFoundError:
+        pass
+    stamp_path.touch()
+
+    entries = []
+    for path in CACHE_DIR.glob('*.npy'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_atime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return
+
+    # Oldest access first
+    entries.sort(key=lambda entry: entry[0])
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        # Drop the in-process mapping along with the file
+        with _segment_memory_lock:
+            _segment_memory.pop(path, None)
+        try:
+            path.unlink()
+            total -= size
+        except FileNotFoundError:
+            continue
+    print(f"Evicted disk cache entries; cache size is now {total} bytes", file=sys.stderr)
+
+class _CacheWriter:
+    """Stream audio chunks into a .npy cache file as they are generated.
+
+    Samples are appended to a temporary file behind a reserved header, so the
+    utterance never has to be held in memory. commit() fills in the header once the
+    final length is known and atomically renames the file into place.
+    """
+
+    def __init__(self, path: Path, dtype=np.float32):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.samples = 0
+        self.tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        self.header_size = len(self._header())
+        self.file = open(self.tmp_path, 'wb')
+        self.file.seek(self.header_size)
+
+    def _header(self) -> bytes:
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, {
+            'descr': np.lib.format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (self.samples,),
+        })
+        return header.getvalue()
+
+    def write(self, audio: np.ndarray):
+        audio = np.ascontiguousarray(audio, dtype=self.dtype)
+        self.file.write(audio.data)
+        self.samples += len(audio)
+
+    def commit(self):
+        header = self._header()
+        if len(header) != self.header_size:
+            raise ValueError("Cache header size changed while writing")
+        self.file.seek(0)
+        self.file.write(header)
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        self.file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+def _save_cache_entry(cache_writer: _CacheWriter):
+    """Commit a finished cache file, or drop it if nothing was generated."""
+    try:
+        if not cache_writer.samples:
+            cache_writer.discard()
+            return
+        cache_writer.commit()
+        print(f"Saved audio to disk cache: {cache_writer.path}", file=sys.stderr)
+        _evict_cache_if_needed()
+    except Exception as e:
+        cache_writer.discard()
+        print(f"Failed to save to disk cache: {e}", file=sys.stderr)
+
+def _g2p_cache_path() -> Path:
+    """Return the G2P database path, named after the installed kokoro and misaki
+    versions so an upgrade never serves phonemes from the old ones."""
+    versions = []
+    for package in ('kokoro', 'misaki'):
+        try:
+            versions.append(f"{package}{importlib.metadata.version(package)}")
+        except importlib.metadata.PackageNotFoundError:
+            versions.append(package)
+    return CACHE_DIR / f"g2p-{'-'.join(versions)}.db"
+
+def _g2p_to_plain(result):
+    """Convert a G2P result to builtins for the disk cache.
+
+    misaki's tokens carry an MToken.Underscore, an addict.Dict that pickles but
+    can't be unpickled, so tokens are stored as their fields plus a plain dict.
+    """
+    phonemes, tokens = result
+    if tokens is not None:
+        tokens = [
+            (
+                {field.name: getattr(token, field.name) for field in dataclasses.fields(token) if field.name != '_'},
+                None if token._ is None else dict(token._),
+            )
+            for token in tokens
+        ]
+    return phonemes, tokens
+
+def _g2p_from_plain(plain):
+    """Rebuild a G2P result stored by _g2p_to_plain."""
+    phonemes, tokens = plain
+    if tokens is not None:
+        from misaki.token import MToken
+        tokens = [
+            MToken(**fields, _=None if extra is None else MToken.Underscore(**extra))
+            for fields, extra in tokens
+        ]
+    return phonemes, tokens
+
+class _CachedG2P:
+    """Wraps a pipeline's G2P callable with an in-memory LRU and a shelve disk cache.
+
+    Callers get a deep copy of the cached result, since KPipeline writes word
+    timestamps into the returned tokens.
+    """
+
+    # File name suffixes the dbm backends add to a shelve path
+    _DBM_SUFFIXES = ('', '.db', '.dat', '.dir', '.pag', '.bak')
+
+    def __init__(self, g2p, lang_code: str, path: Path | None = None):
+        self._g2p = g2p
+        self._lang_code = lang_code
+        path = path or _g2p_cache_path()
+        self._path = str(path)
+        self._files = [path.with_name(path.name + suffix) for suffix in self._DBM_SUFFIXES]
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # misaki's espeak fallback keeps global state in the espeak library, so
+        # concurrent synthesis workers phonemize one at a time
+        self._g2p_lock = threading.Lock()
+        self._remove_stale_databases(path)
+
+    @staticmethod
+    def _remove_stale_databases(path: Path):
+        """Delete databases left behind by other kokoro/misaki versions."""
+        for stale in path.parent.glob('g2p*'):
+            if not stale.name.startswith(path.name):
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+    def _disk_size(self) -> int:
+        size = 0
+        for file in self._files:
+            try:
+                size += file.stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def __getattr__(self, name):
+        # Anything besides the call itself (lexicons, fallbacks, ...) is the wrapped G2P's
+        return getattr(self._g2p, name)
+
+    def __call__(self, text, *args, **kwargs):
+        if args or kwargs or not isinstance(text, str):
+            with self._g2p_lock:
+                return self._g2p(text, *args, **kwargs)
+        key = f"{self._lang_code}|{text}"
+        result = self._lookup(key)
+        if result is None:
+            with self._g2p_lock:
+                result = self._g2p(text)
+            self._store(key, result)
+        return copy.deepcopy(result)
+
+    def _lookup(self, key: str):
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                return result
             try:
-                audio = np.load(cache_path)
-                sd.play(audio, 24000)
-                sd.wait()
+                # Opened per lookup (only on memory misses) so several server
+                # processes can share the file
+                with shelve.open(self._path, flag='r') as db:
+                    plain = db.get(key)
+                if plain is None:
+                    return None
+                result = _g2p_from_plain(plain)
+            except Exception:
+                # Missing or locked database, or an unreadable entry: treat as a miss
                 return None
-            except Exception as e:
-                print(f"Failed to load cache file: {e}", file=sys.stderr)
-                # Fallthrough to regeneration if cache load fails
+            self._remember(key, result)
+            return result
 
-        print(f"Generating audio for: '{text[:20]}...'", file=sys.stderr)
-        
-        # 2. Setup Queue for Gapless Playback
-        q = queue.Queue()
-        playback_error = None
-        
-        def playback_worker():
-            nonlocal playback_error
+    def _store(self, key: str, result):
+        with self._lock:
+            self._remember(key, result)
             try:
-                while True:
-                    audio_chunk = q.get()
-                    if audio_chunk is None:
-                        q.task_done()
-                        break
-                    
-                    # Play blockingly in this thread
-                    sd.play(audio_chunk, 24000)
-                    sd.wait()
-                    q.task_done()
+                plain = _g2p_to_plain(result)
+                # dbm files don't shrink, so the database is recreated empty
+                # once it outgrows its budget
+                flag = 'n' if self._disk_size() > G2P_CACHE_MAX_BYTES else 'c'
+                with shelve.open(self._path, flag=flag) as db:
+                    db[key] = plain
             except Exception as e:
-                playback_error = e
+                print(f"Failed to write G2P cache: {e}", file=sys.stderr)
 
-        # Start consumer thread
-        t = threading.Thread(target=playback_worker, daemon=True)
-        t.start()
+    def _remember(self, key: str, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        if len(self._memory) > G2P_MEMORY_CACHE_SIZE:
+            self._memory.popitem(last=False)
 
-        full_audio_pieces = []
-        
-        # 3. Generate Audio
-        with contextlib.redirect_stdout(sys.stderr):
-            # Generator: Process and yield audio
-            # Using a more granular split pattern (split on newlines OR sentence endings)
-            # to allow for faster time-to-first-audio on long texts
-            generator = pipeline(
-                text, 
-                voice=voice, 
-                speed=speed, 
-                split_pattern=r'\n+|(?<=[.!?])\s+'
-            )
-            
-            for i, result in enumerate(generator):
-                # Compatibility layer: Handle both KPipeline.Result objects and legacy tuples
-                audio = None
-                
-                # Check for KPipeline.Result (v0.9.4+)
-                if hasattr(result, 'output') and hasattr(result.output, 'audio'):
-                    audio = result.output.audio
-                
-                # Check for legacy tuple (v0.3.0) -> (graphemes, phonemes, audio)
-                elif isinstance(result, (list, tuple)) and len(result) == 3:
-                    _, _, audio = result
-                
-                if audio is not None:
-                    # Ensure audio is numpy array (MPS/CUDA returns wrappers or tensors)
-                    if isinstance(audio, torch.Tensor):
-                        audio = audio.detach().cpu().numpy()
-                    
-                    # Normalize audio if clipping is detected (prevents "crounch")
-                    if len(audio) > 0:
-                        max_val = np.max(np.abs(audio))
-                        if max_val > 1.0:
-                            audio = audio / max_val * 0.99
-                    
-                    # Producer: Push to queue
-                    q.put(audio.copy()) 
-                    full_audio_pieces.append(audio)
-            
-            # Signal end of stream
-            q.put(None)
-        
-        # Wait for playback to finish
-        t.join()
+if numba is not None:
+    # Not parallel=True: with MCP_KOKORO_SYNTH_WORKERS > 1 chunks are converted
+    # concurrently, which numba's default threading layer doesn't support, and
+    # sentence-sized chunks are too short to amortize a thread pool anyway
+    @numba.njit(fastmath=True, cache=True)
+    def _pcm16_kernel(audio, out):
+        # Scale, clip and cast in one pass, without a float intermediate. Scaling
+        # stays in float32 so results match the NumPy fallback exactly.
+        scale = np.float32(PCM16_SCALE)
+        for i in range(audio.shape[0]):
+            value = audio[i] * scale
+            if value > 32767.0:
+                value = 32767.0
+            elif value < -32768.0:
+                value = -32768.0
+            out[i] = np.int16(value)
+else:
+    _pcm16_kernel = None
+
+def _to_pcm16(audio: np.ndarray) -> np.ndarray:
+    """Quantize float audio in [-1, 1] to 16-bit PCM."""
+    if _pcm16_kernel is not None:
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        # A fresh buffer per chunk: the result is queued for playback and cached
+        out = np.empty(audio.shape, dtype=np.int16)
+        _pcm16_kernel(audio.reshape(-1), out.reshape(-1))
+        return out
+    # Scale into one float32 buffer and clip it in place, so the only other
+    # allocation is the int16 result
+    scaled = np.multiply(audio, PCM16_SCALE, dtype=np.float32)
+    np.clip(scaled, -32768, 32767, out=scaled)
+    return scaled.astype(np.int16)
+
+def _split_text(text: str) -> list[str]:
+    """Split text into non-empty segments on newlines and sentence endings."""
+    return [segment for segment in (part.strip() for part in _SPLIT_RE.split(text)) if segment]
+
+def _split_first_clause(sentence: str) -> list[str]:
+    """Split a long sentence at its first clause boundary, for faster first audio.
+
+    Only generation is split: the audio of both parts is cached under the whole
+    sentence's key, so the sentence hits the cache wherever it appears later. The
+    parts are spoken separately, though, so the pause and intonation at the split
+    differ slightly from generating the sentence in one go.
+    """
+    if len(sentence) > FIRST_SEGMENT_MAX_CHARS:
+        for match in _CLAUSE_RE.finditer(sentence):
+            # Skip clauses too short to be worth a separate generation step
+            if match.start() >= FIRST_CLAUSE_MIN_CHARS:
+                return [sentence[:match.start()], sentence[match.end():]]
+    return [sentence]
+
+def _extract_audio(result):
+    """Return the audio from a pipeline result, or None if it has none."""
+    # Compatibility layer: Handle both KPipeline.Result objects and legacy tuples
+    # Check for KPipeline.Result (v0.9.4+)
+    if hasattr(result, 'output') and hasattr(result.output, 'audio'):
+        return result.output.audio
+    # Check for legacy tuple (v0.3.0) -> (graphemes, phonemes, audio)
+    if isinstance(result, (list, tuple)) and len(result) == 3:
+        return result[2]
+    return None
+
+_stdout_redirect_lock = threading.Lock()
+_stdout_redirect_depth = 0
+_saved_stdout = None
+
+@contextlib.contextmanager
+def _stdout_to_stderr():
+    """Redirect stdout to stderr; safe to use from concurrent synthesis workers.
 
-        if playback_error:
-            raise playback_error
+    contextlib.redirect_stdout restores whatever stdout was on entry, so redirects
+    overlapping across threads can leave stdout pointing at stderr for good. Here
+    the first entry swaps stdout and the last exit restores it.
+    """
+    global _stdout_redirect_depth, _saved_stdout
+    with _stdout_redirect_lock:
+        if _stdout_redirect_depth == 0:
+            _saved_stdout = sys.stdout
+            sys.stdout = sys.stderr
+        _stdout_redirect_depth += 1
+    try:
+        yield
+    finally:
+        with _stdout_redirect_lock:
+            _stdout_redirect_depth -= 1
+            if _stdout_redirect_depth == 0:
+                sys.stdout = _saved_stdout
+                _saved_stdout = None
+
+def _iter_segment_audio(pipeline, segment: str, voice: str, speed: float):
+    """Yield the raw audio chunks the pipeline generates for one segment.
+
+    Kokoro only prints while setting up a generation (e.g. loading the voice), so
+    stdout is redirected around creating the generator and pulling its first
+    result instead of for the whole loop. Redirection swaps sys.stdout for every
+    thread, which would also capture the MCP server's own output.
+    """
+    with _stdout_to_stderr():
+        generator = pipeline(segment, voice=voice, speed=speed, split_pattern=None)
+        first = next(generator, None)
+    if first is None:
+        return
+    for result in itertools.chain((first,), generator):
+        audio = _extract_audio(result)
+        if audio is not None:
+            yield audio
+
+def _to_numpy(audio) -> np.ndarray:
+    """Convert a generated audio chunk to a numpy array, copying only when needed."""
+    if not isinstance(audio, torch.Tensor):
+        return np.asarray(audio)
+    audio = audio.detach()
+    if audio.device.type != 'cpu':
+        # sounddevice can only read host memory, so accelerator output has to be transferred
+        audio = audio.cpu()
+    # Mixed-precision output is cast back to float32; CPU float32 tensors share
+    # their memory with the resulting array
+    return audio.float().numpy()
+
+def _normalize_peak(audio: np.ndarray) -> np.ndarray:
+    """Scale a chunk in place so its peak stays below 1.0 when clipping is detected."""
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    if audio.size == 0:
+        return audio
+    if numpy_minmax is not None:
+        # Single SIMD pass over contiguous float32 data
+        min_val, max_val = numpy_minmax.minmax(audio)
+    else:
+        min_val, max_val = audio.min(), audio.max()
+    peak = max(-float(min_val), float(max_val))
+    if peak > 1.0:
+        np.multiply(audio, 0.99 / peak, out=audio)
+    return audio
+
+class _PlaybackRequest:
+    """Chunks of one speak() request, handed to the shared audio worker thread.
+
+    Completion is reported to the event loop the request was created on, so the
+    speak() coroutine awaits playback without tying up an executor thread.
+    """
+
+    def __init__(self, null_sink: bool = False):
+        self.null_sink = null_sink
+        self.error = None
+        # Set when the speak() call is cancelled; generation stops at the next
+        # segment and the audio worker drops whatever is still queued
+        self.cancelled = False
+        self._loop = asyncio.get_running_loop()
+        self._done = self._loop.create_future()
+        self.created_at = time.perf_counter()
+        self.first_audio_at = None
 
-        # 4. Save to Disk Cache
-        if full_audio_pieces:
+    @property
+    def time_to_first_audio(self) -> float | None:
+        """Seconds from creating the request to its first chunk being ready to play."""
+        if self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.created_at
+
+    def push(self, audio_chunk):
+        if self.first_audio_at is None:
+            self.first_audio_at = time.perf_counter()
+        if self.null_sink:
+            return
+        _audio_queue.put((audio_chunk, self))
+
+    def cancel(self):
+        """Stop generating and playing the request's audio."""
+        self.cancelled = True
+
+    def close(self):
+        """Signal the end of the request's audio; sent once, by _generate_sync."""
+        if self.null_sink:
+            self.finish()
+            return
+        _audio_queue.put((None, self))
+
+    def finish(self):
+        """Mark the request as played; safe to call from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._set_done)
+        except RuntimeError:
+            # The event loop is already closed, so nobody is waiting anymore
+            pass
+
+    def _set_done(self):
+        if not self._done.done():
+            self._done.set_result(None)
+
+    async def wait(self):
+        """Wait until all of the request's audio has played, returning any playback error."""
+        await self._done
+        return self.error
+
+def _audio_main():
+    """Play queued chunks through one persistent OutputStream, for the life of the server.
+
+    Chunks are 16-bit PCM arrays, written back to back so segments play without
+    gaps. Cached segments are queued by path and only mapped once they are about to
+    play, so a long, mostly cached request doesn't hold a file descriptor for every
+    queued sentence. The stream is stopped (which waits for buffered audio to play
+    out) at the end of each request and restarted on the next one, instead of
+    reopening the device every time.
+    """
+    stream = None
+    while True:
+        audio_chunk, request = _audio_queue.get()
+        if request is None:
+            # Server shutdown: let buffered audio play out, then release the device
+            if stream is not None:
+                try:
+                    stream.stop()
+                    stream.close()
+                except Exception as e:
+                    print(f"Failed to close audio stream: {e}", file=sys.stderr)
+            return
+        if audio_chunk is None:
+            if stream is not None and stream.active:
+                try:
+                    if request.cancelled:
+                        # Discard buffered audio instead of playing it out
+                        stream.abort()
+                    else:
+                        stream.stop()
+                except Exception as e:
+                    request.error = request.error or e
+            request.finish()
+            continue
+        if request.error is not None or request.cancelled:
+            # Skip the rest of a request whose playback failed or was cancelled
+            continue
+        if isinstance(audio_chunk, Path):
             try:
-                full_audio = np.concatenate(full_audio_pieces)
-                np.save(cache_path, full_audio)
-                print(f"Saved audio to disk cache: {cache_path}", file=sys.stderr)
+                audio_chunk = _load_cached_segment(audio_chunk)
             except Exception as e:
-                print(f"Failed to save to disk cache: {e}", file=sys.stderr)
+                request.error = e
+                continue
+        try:
+            if stream is None:
+                stream = sd.OutputStream(
+                    samplerate=SAMPLE_RATE,
+                    channels=1,
+                    dtype='int16',
+                    blocksize=1024,
+                )
+            if not stream.active:
+                stream.start()
+            # Generated and cached audio is already 16-bit PCM, so it goes to
+            # PortAudio as is
+            stream.write(audio_chunk)
+        except Exception as e:
+            request.error = e
+            # Reopen the device on the next chunk in case it went away
+            if stream is not None:
+                try:
+                    stream.close(ignore_errors=True)
+                except Exception:
+                    pass
+                stream = None
+
+_audio_queue = queue.Queue()
+_audio_worker = threading.Thread(target=_audio_main, name="kokoro-audio", daemon=True)
+_audio_worker.start()
+
+# Seconds to wait at exit for queued audio to finish before the device is dropped
+AUDIO_SHUTDOWN_TIMEOUT = 5.0
 
+@atexit.register
+def _shutdown_audio():
+    """Stop the audio worker and close its OutputStream when the server exits."""
+    _audio_queue.put((None, None))
+    _audio_worker.join(timeout=AUDIO_SHUTDOWN_TIMEOUT)
+
+def _preload_voice(pipeline, voice: str):
+    """Load a voice pack into the pipeline, from a local .npy copy when available.
+
+    KPipeline resolves each voice through the Hugging Face hub on first use in every
+    process and unpickles the .pt pack; the extracted style tensor is kept on disk so
+    later processes only need a plain np.load. Loading up front also keeps the
+    synthesis workers from racing to load the same voice.
+    """
+    voices = getattr(pipeline, 'voices', None)
+    if not isinstance(voices, dict) or not _VOICE_NAME_RE.match(voice):
+        return
+    path = VOICE_CACHE_DIR / f"{voice}.npy"
+    try:
+        if path.exists():
+            if voice not in voices:
+                voices[voice] = torch.from_numpy(np.load(path))
+            return
+        # A voice the pipeline already loaded itself still gets its local copy
+        pack = voices.get(voice)
+        if pack is None:
+            with _stdout_to_stderr():
+                pack = pipeline.load_voice(voice)
+        VOICE_CACHE_DIR.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.save(f, pack.detach().cpu().numpy())
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Failed to cache voice '{voice}': {e}", file=sys.stderr)
+
+def _synthesize_segment(pipeline, segment: str, voice: str, speed: float) -> list[np.ndarray]:
+    """Generate the audio chunks for one segment as 16-bit PCM on a synthesis worker."""
+    # Grad mode and autocast are thread-local, so each worker enters them itself.
+    # inference_mode skips autograd bookkeeping that TTS never uses.
+    with torch.inference_mode(), _autocast_context():
+        chunks = []
+        for audio in _iter_segment_audio(pipeline, segment, voice, speed):
+            # Ensure audio is numpy array (MPS/CUDA returns wrappers or tensors)
+            audio = _to_numpy(audio)
+            # Normalize audio if clipping is detected (prevents "crounch"), then
+            # quantize once; the same PCM is played and cached
+            chunks.append(_to_pcm16(_normalize_peak(audio)))
+        return chunks
+
+# Recently used cache files, by path; the arrays are read-only memory maps, so they
+# hold page cache rather than process memory
+_segment_memory = OrderedDict()
+_segment_memory_lock = threading.Lock()
+
+def _remember_segment(cache_path: Path, audio: np.ndarray):
+    with _segment_memory_lock:
+        _segment_memory[cache_path] = audio
+        _segment_memory.move_to_end(cache_path)
+        if len(_segment_memory) > SEGMENT_MEMORY_CACHE_SIZE:
+            _segment_memory.popitem(last=False)
+
+def _cached_segment_samples(cache_path: Path, segment: str) -> int | None:
+    """Return the number of cached samples for a segment, or None on a cache miss.
+
+    Only the .npy header is read; the audio itself is mapped by the audio worker
+    when the segment plays.
+    """
+    with _segment_memory_lock:
+        audio = _segment_memory.get(cache_path)
+        if audio is not None:
+            _segment_memory.move_to_end(cache_path)
+    try:
+        # Refresh the access time explicitly, since filesystems mounted with
+        # noatime/relatime won't, to keep LRU eviction accurate. Memory hits count
+        # as uses too, or eviction would drop the most frequently played sentences.
+        os.utime(cache_path)
+        if audio is not None:
+            print(f"Memory cache hit for: '{segment[:20]}...'", file=sys.stderr)
+            return len(audio)
+        with open(cache_path, 'rb') as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, _, _ = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, _, _ = np.lib.format.read_array_header_2_0(f)
+    except FileNotFoundError:
+        # Never cached, or evicted by another process
+        with _segment_memory_lock:
+            _segment_memory.pop(cache_path, None)
+        return None
+    except Exception as e:
+        print(f"Failed to read cache file: {e}", file=sys.stderr)
+        # Fall back to regeneration if the cache file is unreadable
         return None
+    print(f"Disk cache hit for: '{segment[:20]}...'", file=sys.stderr)
+    return shape[0]
+
+def _load_cached_segment(cache_path: Path) -> np.ndarray:
+    """Return a cached segment's audio, memory-mapping the file if it isn't mapped yet."""
+    with _segment_memory_lock:
+        audio = _segment_memory.get(cache_path)
+    if audio is not None:
+        return audio
+    # Memory-map the file so playback starts after the first page is read; the
+    # audio worker only ever reads from it
+    audio = np.load(cache_path, mmap_mode='r')
+    _remember_segment(cache_path, audio)
+    return audio
+
+def _cache_segment(cache_path: Path, chunks: list[np.ndarray]):
+    """Save a generated segment's 16-bit PCM chunks to the disk cache."""
+    try:
+        cache_writer = _CacheWriter(cache_path, dtype=np.int16)
     except Exception as e:
-        return e
+        print(f"Failed to open disk cache file: {e}", file=sys.stderr)
+        return
+    try:
+        for audio in chunks:
+            cache_writer.write(audio)
+    except Exception as e:
+        print(f"Failed to write to disk cache: {e}", file=sys.stderr)
+        cache_writer.discard()
+        return
+    _save_cache_entry(cache_writer)
+
+class _SpeakResult(NamedTuple):
+    """Outcome of _generate_sync: the error that stopped generation, if any, and
+    the number of samples handed to playback."""
+    error: Exception | None
+    samples: int
+
+def _generate_sync(texts: list[str], voice: str, speed: float, pipeline, playback: _PlaybackRequest, cache: bool = True):
+    """Synchronous function to generate audio for a playback request with persistent file caching.
+
+    Audio is cached per sentence, so editing one sentence of a longer text only
+    regenerates that sentence. Missing sentences are queued on the synthesis
+    workers up front, so later sentences are generated while earlier ones play,
+    and are played back in their original order.
+
+    The texts are generated as one batch and played back to back: sentences
+    missing from any of them are queued together, and a sentence that occurs more
+    than once is only synthesized once.
+    """
+    futures = {}
+    samples = 0
+    try:
+        _preload_voice(pipeline, voice)
+
+        # 1. Check Disk Cache, and queue synthesis of every missing segment up front.
+        # Text is pre-split on newlines OR sentence endings for faster
+        # time-to-first-audio on long texts; each segment is handed to the
+        # pipeline on its own so it doesn't re-split (or see empty chunks).
+        segments = []
+        sentences = itertools.chain.from_iterable(map(_split_text, texts))
+        for index, segment in enumerate(sentences):
+            cache_path = _get_cache_path(segment, voice, speed)
+            if cache_path in futures:
+                # Repeated sentence: play the audio that is already being generated
+                segments.append((cache_path, None, futures[cache_path]))
+                continue
+            cached_samples = _cached_segment_samples(cache_path, segment)
+            if cached_samples is not None:
+                segments.append((cache_path, cached_samples, None))
+                continue
+            print(f"Generating audio for: '{segment[:20]}...'", file=sys.stderr)
+            parts = _split_first_clause(segment) if index == 0 else [segment]
+            pending = [
+                _synthesis_executor.submit(_synthesize_segment, pipeline, part, voice, speed)
+                for part in parts
+            ]
+            futures[cache_path] = pending
+            segments.append((cache_path, None, pending))
+
+        # 2. Hand the audio to the audio worker in order. It only reads from the
+        # chunks, so they do not need their own copies. Cached segments are
+        # handed over by path.
+        cached = set()
+        for cache_path, cached_samples, pending in segments:
+            if playback.cancelled:
+                break
+            if pending is None:
+                playback.push(cache_path)
+                samples += cached_samples
+                continue
+
+            chunks = []
+            for future in pending:
+                for audio in future.result():
+                    playback.push(audio)
+                    samples += len(audio)
+                    chunks.append(audio)
+
+            # 3. Save to Disk Cache
+            if cache and chunks and cache_path not in cached:
+                _cache_segment(cache_path, chunks)
+                cached.add(cache_path)
+
+        return _SpeakResult(None, samples)
+    except Exception as e:
+        return _SpeakResult(e, samples)
+    finally:
+        # Don't keep synthesizing segments that will never be played
+        for future in itertools.chain.from_iterable(futures.values()):
+            future.cancel()
+        # Signal end of stream, also on failure so playback doesn't wait forever
+        playback.close()
+
+# Workers that synthesize the missing segments of a request. One by default: CUDA
+# work from several threads still lands on one stream, and on CPU torch already
+# uses every physical core. Generation overlaps playback either way. The workers
+# share one KPipeline; its G2P is serialized by _CachedG2P, and the MPS backend
+# isn't thread-safe, so MPS always gets a single worker.
+SYNTH_WORKERS = 1 if DEVICE == 'mps' and not QUANT else max(1, int(os.environ.get('MCP_KOKORO_SYNTH_WORKERS', 1)))
+_synthesis_executor = ThreadPoolExecutor(max_workers=SYNTH_WORKERS, thread_name_prefix="kokoro-synth")
+
+# Generation is serialized, so each request's chunks reach the audio worker in order.
+# One request's audio can be generated while the previous request is still playing.
+generation_lock = asyncio.Lock()
 
 @mcp.tool()
-async def speak(text: str, voice: str = "af_heart", speed: float = 1.0) -> str:
+async def speak(text: str | list[str], voice: str = "af_heart", speed: float = 1.0, cache: bool = True) -> str:
     """
     Speak the provided text using Kokoro TTS.
     
     Args:
-        text (str): The text to speak.
+        text (str | list[str]): The text to speak, or a list of texts to speak back to back.
         voice (str): The voice to use (default: 'af_heart'). Options often include 'af_bella', 'af_sarah', 'am_adam', 'af_heart', etc.
         speed (float): Speaking speed (default: 1.0).
+        cache (bool): Whether to save the generated audio to the disk cache (default: True).
     """
-    if not text or not text.strip():
+    # Clean text: replace newlines with spaces to avoid TTS issues
+    texts = [text] if isinstance(text, str) else text
+    texts = [item.replace('\n', ' ') for item in texts if item and item.strip()]
+    if not texts:
         return "Speech completed successfully."
 
-    if pipeline is None:
+    current_pipeline = await get_pipeline_async()
+    if current_pipeline is None:
         return "Error: Pipeline failed to initialize during server startup. Check logs for details."
 
-    # Run the blocking generation/playback in a separate thread
-    # Clean text: replace newlines with spaces to avoid TTS issues
-    text = text.replace('\n', ' ')
-    
-    error = await asyncio.to_thread(_speak_sync, text, voice, speed, pipeline)
+    if DRY_RUN:
+        return "Speech completed successfully."
+
+    if sd is None and not NULL_SINK:
+        return "Error: sounddevice is unavailable; install PortAudio to enable playback."
+
+    playback = _PlaybackRequest(null_sink=NULL_SINK)
+
+    # Run the blocking generation in a separate thread; the audio worker plays
+    # chunks as they are produced
+    async with generation_lock:
+        task = asyncio.ensure_future(
+            asyncio.to_thread(_generate_sync, texts, voice, speed, current_pipeline, playback, cache)
+        )
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            playback.cancel()
+            # The thread can't be interrupted, so keep holding the lock until it
+            # returns; otherwise its remaining chunks and end marker would be
+            # queued in between the next request's
+            while not task.done():
+                try:
+                    await asyncio.shield(task)
+                except asyncio.CancelledError:
+                    pass
+            raise
+
+    if playback.time_to_first_audio is not None:
+        print(f"Time to first audio: {playback.time_to_first_audio:.3f}s", file=sys.stderr)
+    print(f"Generated {result.samples / SAMPLE_RATE:.2f}s of audio", file=sys.stderr)
+
+    try:
+        playback_error = await playback.wait()
+    except asyncio.CancelledError:
+        playback.cancel()
+        raise
+    error = result.error or playback_error
     
     if error:
         return f"Error speaking text: {str(error)}"
@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+
+import numpy as np
+import torch
+
+# Quantized Kokoro exports published in the ONNX repo, by MCP_KOKORO_QUANT value
+ONNX_REPO_ID = 'onnx-community/Kokoro-82M-ONNX'
+ONNX_MODEL_FILES = {
+    'int8': 'onnx/model_quantized.onnx',
+}
+
+
+class OnnxKokoroModel:
+    """Stand-in for KModel that runs a quantized ONNX export through ONNX Runtime.
+
+    KPipeline keeps doing G2P, chunking and voice loading, and calls this object the
+    same way it calls a KModel: with a phoneme string and the matching style vector.
+    """
+
+    # Voice packs are moved to the model's device before inference
+    device = torch.device('cpu')
+
+    def __init__(self, quant: str = 'int8', repo_id: str = 'hexgrad/Kokoro-82M', num_threads: int | None = None):
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+
+        if quant not in ONNX_MODEL_FILES:
+            raise ValueError(f"Unsupported quantization '{quant}', expected one of: {', '.join(ONNX_MODEL_FILES)}")
+
+        # The phoneme vocabulary comes from the original model's config
+        with open(hf_hub_download(repo_id=repo_id, filename='config.json'), encoding='utf-8') as f:
+            self.vocab = json.load(f)['vocab']
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Let inference use every core (ONNX Runtime defaults to physical cores only),
+        # unless MCP_KOKORO_NUM_THREADS says otherwise
+        options.intra_op_num_threads = num_threads or os.cpu_count() or 0
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        model_path = hf_hub_download(repo_id=ONNX_REPO_ID, filename=ONNX_MODEL_FILES[quant])
+        self.session = self._create_session(ort, model_path, options)
+        # Inputs are (input_ids, style, speed); names differ between exports
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    @staticmethod
+    def _create_session(ort, model_path: str, options):
+        """Create the inference session, preferring OpenVINO (Intel iGPU/NPU) when installed."""
+        if 'OpenVINOExecutionProvider' in ort.get_available_providers():
+            providers = [
+                ('OpenVINOExecutionProvider', {'device_type': os.environ.get('MCP_KOKORO_OPENVINO_DEVICE', 'GPU_FP16')}),
+                'CPUExecutionProvider',
+            ]
+            try:
+                return ort.InferenceSession(model_path, sess_options=options, providers=providers)
+            except Exception as e:
+                print(f"OpenVINO execution provider unavailable, using CPU: {e}", file=sys.stderr)
+        return ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+
+    def __call__(self, phonemes: str, ref_s: torch.Tensor, speed: float = 1, return_output: bool = False):
+        from kokoro.model import KModel
+
+        input_ids = [i for i in map(self.vocab.get, phonemes) if i is not None]
+        inputs = (
+            np.array([[0, *input_ids, 0]], dtype=np.int64),
+            ref_s.detach().cpu().numpy().reshape(1, -1).astype(np.float32, copy=False),
+            np.array([speed], dtype=np.float32),
+        )
+        waveform = self.session.run(None, dict(zip(self.input_names, inputs)))[0]
+        audio = torch.from_numpy(waveform.reshape(-1))
+        # The export doesn't return durations, so KPipeline skips word timestamps
+        return KModel.Output(audio=audio, pred_dur=None) if return_output else audio
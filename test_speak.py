@@ -1,10 +1,26 @@
 import asyncio
-import sys
-from mcp_kokoro import speak
+import os
+from typing import Final
+
+# Exercise generation without playing audio; set MCP_KOKORO_NULL_SINK=0 to listen
+os.environ.setdefault("MCP_KOKORO_NULL_SINK", "1")
+
+from mcp_kokoro import speak, start_background_loading
+
+# Load the model weights in the background; speak() waits for them
+start_background_loading()
+
+TEXT: Final = "Hello! This is a test of the Kokoro Text to Speech system."
+VOICE: Final = "af_heart"
+SPEED: Final = 1.0
 
 async def test():
     print("Testing speak tool...")
-    result = await speak("Hello! This is a test of the Kokoro Text to Speech system.")
+    result = await speak(TEXT, voice=VOICE, speed=SPEED)
+    print(result)
+
+    print("Testing speak tool with a list of texts...")
+    result = await speak([TEXT, "This sentence is new. " + TEXT], voice=VOICE, speed=SPEED)
     print(result)
 
 if __name__ == "__main__":